@@ -1,85 +1,332 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory, session
-from werkzeug.utils import secure_filename
+import click
+from flask import Flask, Request, Response, render_template, request, redirect, url_for, flash, send_from_directory, session, abort
+from werkzeug.security import safe_join, check_password_hash, generate_password_hash
 from werkzeug.exceptions import RequestEntityTooLarge
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text, column, event, inspect, insert, update, or_, and_
+from sqlalchemy.exc import DBAPIError, OperationalError
 from datetime import datetime
 from dotenv import load_dotenv
-import os, uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import quote
+import os, io, re, hmac, shutil, subprocess, mimetypes, tempfile, threading, multiprocessing
 
 load_dotenv()
 
+class UploadRequest(Request):
+    # non-file form fields are capped in memory
+    max_form_memory_size = 512 * 1024
+    # multipart-bomb bound, far above any real form (game_id + notes + screenshots); Werkzeug's default is 1000
+    max_form_parts = int(os.getenv("MAX_FORM_PARTS", "200"))
+
+    # RAM the file parts of one request may take before spilling to disk
+    spool_budget = 4 * 1024 * 1024
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # typical screenshot submits stay in RAM and go straight to Pillow, bigger ones spill to disk
+        # (Werkzeug's default puts every file on disk once the whole request is over 500 KB)
+        if total_content_length is not None and total_content_length <= self.spool_budget:
+            # the parts together can't exceed the body, so each may spool all of it
+            return tempfile.SpooledTemporaryFile(max_size=total_content_length, mode="rb+")
+        # large (or chunked) body: hand out the budget first come first served, later parts go straight to disk
+        left = getattr(self, "_spool_left", self.spool_budget)
+        size = min(left, 1024 * 1024)
+        self._spool_left = left - size
+        if not size:
+            return tempfile.TemporaryFile("rb+")
+        return tempfile.SpooledTemporaryFile(max_size=size, mode="rb+")
+
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret")
 app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER", "uploads")
+# resolved once; the per-kind folders are created at startup
+UPLOADS_ROOT_ABS = os.path.abspath(app.config["UPLOAD_FOLDER"])
+UPLOAD_DIRS = {sub: os.path.join(UPLOADS_ROOT_ABS, sub) for sub in ("prereg", "discord", "dc_likes", "tweets")}
 db_url = os.getenv("DATABASE_URL", "sqlite:///data.db")
 app.config["SQLALCHEMY_DATABASE_URI"] = db_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Let the front proxy serve /uploads via sendfile(2): USE_X_SENDFILE=1 for Apache/lighttpd, or for nginx
+# UPLOADS_ACCEL_PREFIX=/_protected_uploads/ with the internal location from nginx.conf.example
+app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "0") == "1"
+uploads_accel_prefix = os.getenv("UPLOADS_ACCEL_PREFIX", "")
+# stored names are random per upload (re-uploads get a new URL), so browsers may cache them
+uploads_max_age = int(os.getenv("UPLOADS_MAX_AGE", "86400"))
+# GM logins, read once at startup
+GM_ACCOUNTS = {
+    os.getenv("ADMIN1_USERNAME", "gm1"): os.getenv("ADMIN1_PASSWORD", "gm1password"),
+    os.getenv("ADMIN2_USERNAME", "gm2"): os.getenv("ADMIN2_PASSWORD", "gm2password")
+}
+GM_PASSWORD_HASH_PREFIXES = ("scrypt:", "pbkdf2:")
+# rows per table per GM dashboard page
+gm_page_size = int(os.getenv("GM_PAGE_SIZE", "50"))
+
 max_mb = float(os.getenv("MAX_CONTENT_MB", "100"))
 app.config["MAX_CONTENT_LENGTH"] = int(max_mb * 1024 * 1024)
+app.config["MAX_FORM_MEMORY_SIZE"] = UploadRequest.max_form_memory_size  # read by Flask >= 3.1
+app.config["MAX_FORM_PARTS"] = UploadRequest.max_form_parts
+# single screenshot cap, checked before anything is decoded
+max_file_bytes = int(float(os.getenv("MAX_FILE_MB", "20")) * 1024 * 1024)
+# raw upload bytes are copied to disk in 1 MB chunks
+COPY_CHUNK = 1024 * 1024
 
 # Compression configs
 max_img_long = int(os.getenv("MAX_IMG_LONG", "1600"))
 jpg_quality = int(os.getenv("JPEG_QUALITY", "80"))
-
-ALLOWED_EXTENSIONS = {"png","jpg","jpeg","gif","webp"}
-
-from PIL import Image
+# extra Huffman pass: ~2x encode CPU for a few % smaller files, meant for offline re-pack jobs
+jpg_optimize = os.getenv("JPEG_OPTIMIZE", "0") == "1"
+# baseline by default: the GM dashboard decodes dozens at once and progressive scans decode slower
+# (not honoured by JPEG_BACKEND=mozjpeg, which always re-packs as progressive)
+jpg_progressive = os.getenv("JPEG_PROGRESSIVE", "0") == "1"
+# IMAGE_FORMAT=webp (default) or jpeg: encoding for resized non-passthrough uploads
+image_format = os.getenv("IMAGE_FORMAT", "webp")
+# alpha images up to this many pixels are stored as lossless WebP
+webp_lossless_pixels = int(os.getenv("WEBP_LOSSLESS_MAX_PIXELS", "1000000"))
+# RGB JPEGs already within MAX_IMG_LONG and this size are stored byte-for-byte, skipping decode + re-encode
+skip_recompress_bytes = int(os.getenv("SKIP_RECOMPRESS_KB", "300")) * 1024
+# COMPRESS_ASYNC=1: store the raw upload, commit and respond, then compress on a process pool
+compress_async = os.getenv("COMPRESS_ASYNC", "0") == "1"
+compress_workers = int(os.getenv("COMPRESS_WORKERS", "0")) or None
+# optional lossless oxipng re-pack of PNG outputs, run after the request commits
+oxipng_bin = shutil.which("oxipng") if os.getenv("PNG_OXIPNG", "0") == "1" else None
+
+ALLOWED_EXTENSIONS = frozenset({"png","jpg","jpeg","gif","webp"})
+
+from PIL import Image, ImageFile, ImageOps, features
+
+# keep what decodes of an upload cut short by a flaky mobile connection instead of storing the raw bytes
+ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+if image_format == "webp" and not features.check("webp"):
+    app.logger.warning("IMAGE_FORMAT=webp but Pillow has no WebP support; writing JPEG/PNG.")
+    image_format = "jpeg"
+
+# IMG_BACKEND=vips streams decode/resize through libvips (pip install pyvips; needs libvips) for low peak memory
+img_backend = os.getenv("IMG_BACKEND", "pillow")
+if img_backend == "vips":
+    try:
+        import pyvips
+    except ImportError:
+        app.logger.warning("IMG_BACKEND=vips but pyvips is not installed; using Pillow.")
+        img_backend = "pillow"
+
+if not features.check_feature("libjpeg_turbo"):
+    app.logger.warning("Pillow is not linked against libjpeg-turbo; JPEG encode/decode will be slow. "
+                       "Install Pillow-SIMD (requirements-simd.txt) or build Pillow against libjpeg-turbo.")
+
+# JPEG_BACKEND=mozjpeg: losslessly re-pack JPEG output with mozjpeg (pip install mozjpeg-lossless-optimization)
+# when bytes on disk matter more than encode time; its output is always progressive, whatever JPEG_PROGRESSIVE says
+jpeg_backend = os.getenv("JPEG_BACKEND", "libjpeg")
+if jpeg_backend == "mozjpeg":
+    try:
+        import mozjpeg_lossless_optimization
+    except ImportError:
+        app.logger.warning("JPEG_BACKEND=mozjpeg but mozjpeg-lossless-optimization is not installed; using Pillow only.")
+        jpeg_backend = "libjpeg"
 
 def allowed_file(filename: str, mimetype: str = "") -> bool:
-    ext_ok = ("." in (filename or "")) and (filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS)
-    type_ok = mimetype.startswith("image/") if mimetype else False
-    return ext_ok or type_ok
+    _, dot, ext = (filename or "").rpartition(".")
+    return bool(dot and ext.lower() in ALLOWED_EXTENSIONS) or (mimetype or "")[:6] == "image/"
 
-def compress_image_inplace(abs_path:str, max_long:int, jpg_quality:int):
-    """Open image at abs_path, resize to keep long edge <= max_long, and re-save as JPEG (no alpha) or PNG (alpha)."""
+def compress_image_stream(src_fp, dst_base:str, max_long:int, jpg_quality:int):
+    """Decode image from file-like src_fp, resize to keep long edge <= max_long, and save as dst_base.webp, or .jpg (no alpha) / .png (alpha) when IMAGE_FORMAT=jpeg. Returns None if src_fp is not a decodable image."""
     try:
-        img = Image.open(abs_path)
+        img = Image.open(src_fp)
+        w, h = img.size
+        if (img.format == "JPEG" and img.mode == "RGB" and max(w, h) <= max_long
+                and "exif" not in img.info and "icc_profile" not in img.info
+                and src_fp.seek(0, os.SEEK_END) <= skip_recompress_bytes):
+            # header says it is already small and carries no metadata (GPS, orientation): keep the original bytes
+            target_path = f"{dst_base}.jpg"
+            src_fp.seek(0)
+            with open(target_path, "wb", buffering=0) as out:
+                shutil.copyfileobj(src_fp, out, COPY_CHUNK)
+            return target_path
+        # output format is decided from the header, so resampling runs in the final colour mode
+        has_alpha = (img.mode in ("RGBA","LA","PA")) or ("transparency" in img.info)
+        if img.format in ("JPEG", "MPO") and max(w, h) > max_long:
+            # let libjpeg decode at 1/2, 1/4 or 1/8 scale; LANCZOS below does the exact fit
+            scale = max_long / float(max(w, h))
+            img.draft("RGB", (int(w*scale), int(h*scale)))
+        img.load()
     except Exception:
-        return abs_path
-    w, h = img.size
-    if max(w, h) > max_long:
-        scale = max_long / float(max(w, h))
-        img = img.resize((int(w*scale), int(h*scale)), Image.LANCZOS)
-    has_alpha = (img.mode in ("RGBA","LA")) or ("transparency" in img.info)
-    folder = os.path.dirname(abs_path)
-    name_no_ext = os.path.splitext(os.path.basename(abs_path))[0]
-    if has_alpha:
-        if img.mode not in ("RGB","RGBA"):
-            img = img.convert("RGBA")
-        target_path = os.path.join(folder, f"{name_no_ext}.png")
-        img.save(target_path, format="PNG", optimize=True, compress_level=9)
+        return None
+    out_mode = "RGBA" if has_alpha else "RGB"
+    if img.mode != out_mode:
+        img = img.convert(out_mode)
+    # in-place, only shrinks; with reducing_gap=3 Pillow box-reduces by int(ratio / 3) first, i.e. only for
+    # shrinks of 6x or more, and the final LANCZOS still covers >= 3x. JPEG/MPO already come out of draft()
+    # under 2x, so this matters for big PNG/WebP/GIF sources only
+    img.thumbnail((max_long, max_long), Image.LANCZOS, reducing_gap=3.0)
+    # stored files carry no EXIF, so bake the orientation into the pixels
+    ImageOps.exif_transpose(img, in_place=True)
+    # metadata is not carried over: the JPEG/WebP writers only embed exif/icc_profile when passed, PNG gets icc_profile=None
+    if image_format == "webp":
+        target_path = f"{dst_base}.webp"
+        lossless = has_alpha and img.width * img.height <= webp_lossless_pixels
+        img.save(target_path, format="WEBP", quality=jpg_quality, method=4, lossless=lossless)
+    elif has_alpha:
+        target_path = f"{dst_base}.png"
+        img.save(target_path, format="PNG", optimize=False, compress_level=6, icc_profile=None)
     else:
-        if img.mode != "RGB":
-            img = img.convert("RGB")
-        target_path = os.path.join(folder, f"{name_no_ext}.jpg")
-        img.save(target_path, format="JPEG", quality=jpg_quality, optimize=True, progressive=True)
-    if os.path.normpath(target_path) != os.path.normpath(abs_path):
-        try:
-            os.remove(abs_path)
-        except Exception:
-            pass
+        target_path = f"{dst_base}.jpg"
+        if jpeg_backend == "mozjpeg":
+            out = io.BytesIO()
+            # scan layout is redone by mozjpeg, so the cheapest baseline encode is enough here
+            img.save(out, format="JPEG", quality=jpg_quality, progressive=False, subsampling=2)
+            with open(target_path, "wb") as f:
+                f.write(mozjpeg_lossless_optimization.optimize(out.getvalue()))
+        else:
+            img.save(target_path, format="JPEG", quality=jpg_quality, optimize=jpg_optimize, progressive=jpg_progressive, subsampling=2)
+    return target_path
+
+def compress_image_vips(src_fp, dst_base:str, max_long:int, jpg_quality:int):
+    """libvips version of compress_image_stream: shrink-on-load thumbnail, then dst_base.webp/.jpg/.png the same way."""
+    try:
+        im = pyvips.Image.thumbnail_buffer(src_fp.read(), max_long, height=max_long, size="down")
+        if image_format == "webp":
+            target_path = f"{dst_base}.webp"
+            lossless = im.hasalpha() and im.width * im.height <= webp_lossless_pixels
+            im.write_to_file(target_path, Q=jpg_quality, effort=4, lossless=lossless, strip=True)
+        elif im.hasalpha():
+            target_path = f"{dst_base}.png"
+            im.write_to_file(target_path, compression=6, strip=True)
+        else:
+            target_path = f"{dst_base}.jpg"
+            im.write_to_file(target_path, Q=jpg_quality, optimize_coding=jpg_optimize, interlace=jpg_progressive, strip=True)
+    except pyvips.Error:
+        return None
     return target_path
 
+# shared by all requests: Pillow releases the GIL in its codecs, so one request's images compress in parallel
+img_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+png_pool = ThreadPoolExecutor(max_workers=1) if oxipng_bin else None
+
+def optimize_png_offline(abs_path:str):
+    """Losslessly re-pack a PNG in place with oxipng."""
+    try:
+        subprocess.run([oxipng_bin, "-o", "4", "-q", abs_path], timeout=300, check=False)
+    except Exception:
+        pass
+
+def enqueue_png_optimize(rel_paths):
+    """Queue the PNGs among rel_paths (relative to UPLOAD_FOLDER) for optimize_png_offline."""
+    if png_pool is None:
+        return
+    for rel in rel_paths:
+        if rel and rel.endswith(".png"):
+            png_pool.submit(optimize_png_offline, os.path.join(UPLOADS_ROOT_ABS, rel))
+
+compress_pool = None
+compress_pool_lock = threading.Lock()
+# children come from a forkserver rather than being forked from a worker running request and img_pool threads
+COMPRESS_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+def compress_files(raw_paths, max_long:int, jpg_quality:int):
+    """Process-pool job: compress each raw upload next to itself. Returns output paths (the raw path if undecodable)."""
+    compress = compress_image_vips if img_backend == "vips" else compress_image_stream
+    out = []
+    try:
+        for raw_abs in raw_paths:
+            # per-job output name: a second job on the same row (compress-pending vs. a live worker) can't clobber ours
+            dst_base = f"{raw_abs.rsplit('.orig', 1)[0]}-{os.urandom(4).hex()}"
+            with open(raw_abs, "rb") as fp:
+                out.append(compress(fp, dst_base, max_long, jpg_quality) or raw_abs)
+    except Exception:
+        # e.g. the raw file was already compressed and removed by another job: drop our partial outputs
+        for path in out:
+            if path not in raw_paths:
+                try: os.remove(path)
+                except OSError: pass
+        raise
+    return out
+
+def enqueue_compress(model, row_id, raw_rels):
+    """After commit: compress the raw files of row `row_id` ({column: rel path}) in the background, then point the row at the results."""
+    global compress_pool
+    with compress_pool_lock:
+        if compress_pool is None:
+            # created lazily so each gunicorn worker gets its own pool after fork; the lock keeps concurrent
+            # request threads from each starting one
+            compress_pool = ProcessPoolExecutor(max_workers=compress_workers, mp_context=COMPRESS_MP_CONTEXT)
+    raw_paths = [os.path.join(UPLOADS_ROOT_ABS, rel) for rel in raw_rels.values()]
+    fut = compress_pool.submit(compress_files, raw_paths, max_img_long, jpg_quality)
+    fut.add_done_callback(lambda f: finish_compress(f, model, row_id, raw_rels, raw_paths))
+    return fut
+
+def finish_compress(fut, model, row_id, raw_rels, raw_paths):
+    """Done-callback of enqueue_compress: swap the compressed paths into the row, then drop the raw files."""
+    if fut.exception() is not None:
+        app.logger.error("background compression of %s #%s failed: %s", model.__name__, row_id, fut.exception())
+        return
+    new_rels = {col: upload_rel(p) for col, p in zip(raw_rels, fut.result())}
+    with app.app_context():
+        # only if the row still exists and still points at the raw files
+        stmt = update(model).where(model.id == row_id, *(getattr(model, col) == rel for col, rel in raw_rels.items()))\
+            .values(compressed=True, **new_rels)
+        changed = db.session.execute(stmt).rowcount
+        db.session.commit()
+        if not changed:
+            row = db.session.get(model, row_id)
+            referenced = {getattr(row, col) for col in raw_rels} if row is not None else set()
+    if changed:
+        # the raw files are no longer referenced, except undecodable ones which stay the stored file
+        leftovers = [raw for raw, out in zip(raw_paths, fut.result()) if out != raw]
+        enqueue_png_optimize(new_rels.values())
+    else:
+        # row deleted (or re-pointed) meanwhile: our outputs are orphans, unless the row somehow points at them
+        leftovers = [out for raw, out in zip(raw_paths, fut.result())
+                     if out != raw and upload_rel(out) not in referenced]
+    for path in leftovers:
+        try: os.remove(path)
+        except OSError: pass
+
+# stored file stem: client basename reduced to [A-Za-z0-9_-] (no dots, so ".orig" and extensions stay ours)
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+
+def upload_rel(abs_path):
+    """Path under UPLOADS_ROOT_ABS as stored in the DB. abs_path must be built from UPLOAD_DIRS/UPLOADS_ROOT_ABS."""
+    return abs_path[len(UPLOADS_ROOT_ABS) + 1:].replace(os.sep, "/")
+
+def file_too_big(file_storage):
+    """True if one uploaded file exceeds MAX_FILE_MB (measured on its spooled stream, nothing is read)."""
+    stream = file_storage.stream
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    return size > max_file_bytes
+
 def save_image(file_storage, subdir):
-    """Save under uploads/subdir, then auto-compress. Handles files with/without extension."""
+    """Compress the upload straight from its stream into uploads/subdir. Handles files with/without extension."""
     if not (file_storage and (file_storage.filename or "").strip()):
         return None
-    uploads_root = app.config["UPLOAD_FOLDER"]
-    folder = os.path.join(uploads_root, subdir)
-    os.makedirs(folder, exist_ok=True)
-    orig = secure_filename(file_storage.filename or "image")
-    base = os.path.splitext(orig)[0] or "image"
-    unique = f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
-    temp_path = os.path.join(folder, f"{base}-{unique}.tmp")
-    file_storage.save(temp_path)
-    final_abs = compress_image_inplace(temp_path, max_img_long, jpg_quality)
-    uploads_root_abs = os.path.abspath(uploads_root)
-    final_abs_norm = os.path.abspath(final_abs)
-    rel = os.path.relpath(final_abs_norm, uploads_root_abs)
-    return rel.replace("\\", "/")
-
-db = SQLAlchemy(app)
+    return save_image_stream(file_storage.stream, file_storage.filename, subdir)
+
+def save_image_stream(stream, filename, subdir):
+    """Compress an upload held in file-like stream into uploads/subdir. Safe to call from worker threads."""
+    stem, ext = os.path.splitext(filename or "")
+    base = _UNSAFE_NAME_CHARS.sub("_", stem)[:32].strip("_") or "image"
+    dst_base = f"{UPLOAD_DIRS[subdir]}{os.sep}{base}-{os.urandom(8).hex()}"
+    ext = ext.lower()
+    ext = ext if ext[1:] in ALLOWED_EXTENSIONS else ".bin"
+    if compress_async:
+        # served as-is until enqueue_compress() swaps in the compressed file
+        final_abs, raw_abs = None, f"{dst_base}.orig{ext}"
+    else:
+        compress = compress_image_vips if img_backend == "vips" else compress_image_stream
+        final_abs, raw_abs = compress(stream, dst_base, max_img_long, jpg_quality), f"{dst_base}{ext}"
+    if final_abs is None:
+        # not decodable (or compressed later): keep the upload as-is
+        final_abs = raw_abs
+        stream.seek(0)
+        with open(final_abs, "wb", buffering=0) as out:
+            shutil.copyfileobj(stream, out, COPY_CHUNK)
+    return upload_rel(final_abs)
+
+# post-commit reads (sub.id for enqueue_compress, is_granted in the mark flash) need no re-SELECT;
+# every request gets a fresh session, so nothing outlives the request stale
+db = SQLAlchemy(app, session_options={"expire_on_commit": False})
 
 class Submission(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -94,6 +341,11 @@ class Submission(db.Model):
     is_granted = db.Column(db.Boolean, default=False, nullable=False, index=True)
     granted_by = db.Column(db.String(64), nullable=True)
     granted_at = db.Column(db.DateTime, nullable=True)
+    # False while COMPRESS_ASYNC is still working on the raw upload(s)
+    compressed = db.Column(db.Boolean, default=True, server_default=db.true(), nullable=False)
+    # dashboard: status / game_id filters ordered by created_at DESC
+    __table_args__ = (db.Index("ix_sub_granted_created", "is_granted", "created_at"),
+                      db.Index("ix_sub_gameid_created", "game_id", "created_at"))
 
 class DailyTweet(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -105,6 +357,11 @@ class DailyTweet(db.Model):
     is_granted = db.Column(db.Boolean, default=False, nullable=False, index=True)
     granted_by = db.Column(db.String(64), nullable=True)
     granted_at = db.Column(db.DateTime, nullable=True)
+    # False while COMPRESS_ASYNC is still working on the raw upload(s)
+    compressed = db.Column(db.Boolean, default=True, server_default=db.true(), nullable=False)
+    # dashboard: status / game_id filters ordered by created_at DESC
+    __table_args__ = (db.Index("ix_tweet_granted_created", "is_granted", "created_at"),
+                      db.Index("ix_tweet_gameid_created", "game_id", "created_at"))
 
 class DcLike(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -116,10 +373,109 @@ class DcLike(db.Model):
     is_granted = db.Column(db.Boolean, default=False, nullable=False, index=True)
     granted_by = db.Column(db.String(64), nullable=True)
     granted_at = db.Column(db.DateTime, nullable=True)
+    # False while COMPRESS_ASYNC is still working on the raw upload(s)
+    compressed = db.Column(db.Boolean, default=True, server_default=db.true(), nullable=False)
+    # dashboard: status / game_id filters ordered by created_at DESC
+    __table_args__ = (db.Index("ix_like_granted_created", "is_granted", "created_at"),
+                      db.Index("ix_like_gameid_created", "game_id", "created_at"))
+
+# SQLite: trigram FTS5 shadow tables so game_id substring search is index-backed (set up at init);
+# PostgreSQL gets pg_trgm indexes instead and keeps the LIKE query
+FTS_TABLES = ("submission", "daily_tweet", "dc_like")
+game_id_fts = False
+
+def create_game_id_fts():
+    """Create <table>_fts external-content FTS5 tables over game_id plus the triggers keeping them in sync."""
+    with db.engine.begin() as conn:
+        for t in FTS_TABLES:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :n"), {"n": f"{t}_fts"}).first()
+            conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {t}_fts USING fts5("
+                              f"game_id, content='{t}', content_rowid='id', tokenize='trigram')"))
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {t}_fts_ai AFTER INSERT ON {t} BEGIN "
+                              f"INSERT INTO {t}_fts(rowid, game_id) VALUES (new.id, new.game_id); END"))
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {t}_fts_ad AFTER DELETE ON {t} BEGIN "
+                              f"INSERT INTO {t}_fts({t}_fts, rowid, game_id) VALUES ('delete', old.id, old.game_id); END"))
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {t}_fts_au AFTER UPDATE OF game_id ON {t} BEGIN "
+                              f"INSERT INTO {t}_fts({t}_fts, rowid, game_id) VALUES ('delete', old.id, old.game_id); "
+                              f"INSERT INTO {t}_fts(rowid, game_id) VALUES (new.id, new.game_id); END"))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {t}_fts({t}_fts) VALUES ('rebuild')"))
+
+def create_game_id_trgm():
+    """PostgreSQL: pg_trgm GIN index on game_id, which makes the LIKE '%q%' search index-backed."""
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for t in FTS_TABLES:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{t}_game_id_trgm ON {t} USING gin (game_id gin_trgm_ops)"))
+
+def game_id_match(table, q):
+    """Subquery of ids in `table` whose game_id contains q (trigram MATCH, needs len(q) >= 3)."""
+    phrase = '"' + q.replace('"', '""') + '"'
+    return text(f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH :q").bindparams(q=phrase).columns(column("rowid"))
+
+def sqlite_pragmas(dbapi_conn, conn_record):
+    """WAL so dashboard reads don't block on upload commits; NORMAL sync is durable enough in WAL mode."""
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA mmap_size=268435456")
+    cur.execute("PRAGMA cache_size=-65536")
+    # writers from other gunicorn workers / compression callbacks queue instead of raising "database is locked"
+    cur.execute("PRAGMA busy_timeout=15000")
+    # truncate the -wal file back to 64 MB after checkpoints instead of keeping its high-water mark
+    cur.execute("PRAGMA journal_size_limit=67108864")
+    cur.close()
+
+# image path columns per model, as stored relative to UPLOAD_FOLDER
+IMAGE_COLUMNS = {Submission: ("prereg_1", "prereg_2", "discord_1", "discord_2"),
+                 DailyTweet: ("image_path",),
+                 DcLike: ("image_path",)}
+
+@app.cli.command("gm-hash-password")
+@click.argument("password")
+def gm_hash_password(password):
+    """Print a hash to put in ADMINn_PASSWORD instead of the plaintext password."""
+    click.echo(generate_password_hash(password))
+
+@app.cli.command("compress-pending")
+def compress_pending():
+    """Compress uploads still raw from COMPRESS_ASYNC (queued work is lost when a worker restarts)."""
+    # safe next to a live app: each job writes its own output names and only the first to finish updates the row
+    queued = {}
+    for model, columns in IMAGE_COLUMNS.items():
+        rows = model.query.filter_by(compressed=False).all()
+        queued[model] = [row.id for row in rows]
+        for row in rows:
+            enqueue_compress(model, row.id, {col: getattr(row, col) for col in columns})
+    if compress_pool is not None:
+        compress_pool.shutdown(wait=True)  # also waits for the finish_compress callbacks
+    total = sum(len(ids) for ids in queued.values())
+    pending = sum(model.query.filter(model.id.in_(ids), model.compressed == db.false()).count()
+                  for model, ids in queued.items())
+    click.echo(f"compressed {total - pending} of {total} row(s)" + (f", {pending} still raw (see log)" if pending else ""))
+
+def insert_rows(model, rows):
+    """Bulk-INSERT rows (dicts) in the current transaction. Returns their ids in order when COMPRESS_ASYNC needs them."""
+    if not compress_async:
+        db.session.execute(insert(model), rows)
+        return None
+    if db.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+        return db.session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows).scalars().all()
+    # no ordered RETURNING (SQLite < 3.35, MySQL/MariaDB): let the ORM flush them one by one
+    objs = [model(**row) for row in rows]
+    db.session.add_all(objs)
+    db.session.flush()
+    return [obj.id for obj in objs]
 
 @app.errorhandler(RequestEntityTooLarge)
 def file_too_large(e):
-    flash(f"檔案總大小超過限制：{max_mb} MB。請減少檔案大小或數量。", "error")
+    # Werkzeug raises this from the declared Content-Length before parsing, while reading a chunked body past
+    # MAX_CONTENT_LENGTH, or mid-parse on too many form parts / oversized fields (declared length within the limit)
+    if request.content_length is None or request.content_length > app.config["MAX_CONTENT_LENGTH"]:
+        flash(f"檔案總大小超過限制：{max_mb} MB。請減少檔案大小或數量。", "error")
+    else:
+        flash(f"單次上傳的檔案數量過多（上限約 {UploadRequest.max_form_parts} 個欄位）或備註過長，請分批上傳。", "error")
     return redirect(request.referrer or url_for("index"))
 
 @app.route("/")
@@ -150,6 +506,9 @@ def submit():
         if not allowed_file(f.filename, getattr(f, 'mimetype', '')):
             flash(f"『{label}』檔案格式不支援。", "error")
             return redirect(url_for("index"))
+        if file_too_big(f):
+            flash(f"『{label}』檔案過大（單張上限 {max_file_bytes // (1024 * 1024)} MB）。", "error")
+            return redirect(url_for("index"))
 
     like_valid = [f for f in (dc_like_files or []) if f and f.filename]
     if len(like_valid) < 2:
@@ -159,22 +518,32 @@ def submit():
         if not allowed_file(f.filename, getattr(f, 'mimetype', '')):
             flash("『Discord 點讚』檔案格式不支援，請僅上傳圖片檔。", "error")
             return redirect(url_for("index"))
+        if file_too_big(f):
+            flash(f"『Discord 點讚』檔案過大（單張上限 {max_file_bytes // (1024 * 1024)} MB）。", "error")
+            return redirect(url_for("index"))
 
-    # Save files
-    p1 = save_image(prereg_1, "prereg")
-    p2 = save_image(prereg_2, "prereg")
-    d1 = save_image(discord_1, "discord")
-    d2 = save_image(discord_2, "discord")
+    # Save files in parallel (before opening the write transaction, so SQLite isn't locked during compression)
+    jobs = [(prereg_1, "prereg"), (prereg_2, "prereg"), (discord_1, "discord"), (discord_2, "discord")]
+    jobs += [(f, "dc_likes") for f in like_valid]
+    futures = [img_pool.submit(save_image, f, subdir) for f, subdir in jobs]
+    p1, p2, d1, d2, *like_paths = [fut.result() for fut in futures]
 
-    sub = Submission(game_id=game_id, prereg_1=p1, prereg_2=p2, discord_1=d1, discord_2=d2, notes=notes)
+    # one transaction (one commit/fsync) for the submission and its likes
+    sub = Submission(game_id=game_id, prereg_1=p1, prereg_2=p2, discord_1=d1, discord_2=d2, notes=notes,
+                     compressed=not compress_async)
     db.session.add(sub)
-    db.session.commit()
+    db.session.flush()  # assigns sub.id without committing
 
-    # Save DcLikes
-    for f in like_valid:
-        rel = save_image(f, "dc_likes")
-        db.session.add(DcLike(game_id=game_id, image_path=rel, notes=notes))
+    # Save DcLikes: one multi-row INSERT instead of an ORM add per like
+    like_ids = insert_rows(DcLike, [{"game_id": game_id, "image_path": rel, "notes": notes,
+                                     "compressed": not compress_async} for rel in like_paths])
     db.session.commit()
+    if compress_async:
+        enqueue_compress(Submission, sub.id, dict(zip(IMAGE_COLUMNS[Submission], (p1, p2, d1, d2))))
+        for like_id, rel in zip(like_ids, like_paths):
+            enqueue_compress(DcLike, like_id, {"image_path": rel})
+    else:
+        enqueue_png_optimize([p1, p2, d1, d2] + like_paths)
 
     return render_template("success.html", mode="init", game_id=game_id)
 
@@ -196,19 +565,29 @@ def daily_upload():
         flash("請至少上傳 1 張『每日推文』截圖。", "error")
         return redirect(url_for("daily"))
 
-    saved_any = False
-    for f in files:
-        if f and f.filename != "":
-            if not allowed_file(f.filename, getattr(f, 'mimetype', '')):
-                flash("部分『每日推文』檔案格式不支援，請僅上傳圖片檔。", "error")
-                return redirect(url_for("daily"))
-            rel = save_image(f, "tweets")
-            tweet = DailyTweet(game_id=game_id, image_path=rel, notes=notes)
-            db.session.add(tweet)
-            saved_any = True
-
-    if saved_any:
+    valid = [f for f in files if f and f.filename != ""]
+    for f in valid:
+        if not allowed_file(f.filename, getattr(f, 'mimetype', '')):
+            flash("部分『每日推文』檔案格式不支援，請僅上傳圖片檔。", "error")
+            return redirect(url_for("daily"))
+        if file_too_big(f):
+            flash(f"部分『每日推文』檔案過大（單張上限 {max_file_bytes // (1024 * 1024)} MB）。", "error")
+            return redirect(url_for("daily"))
+
+    # the body is fully parsed by now and each file has its own spooled stream, so workers can read them directly
+    jobs = [(f.stream, f.filename) for f in valid]
+    futures = [img_pool.submit(save_image_stream, stream, filename, "tweets") for stream, filename in jobs]
+    saved_paths = [fut.result() for fut in futures]
+
+    if saved_paths:
+        tweet_ids = insert_rows(DailyTweet, [{"game_id": game_id, "image_path": rel, "notes": notes,
+                                              "compressed": not compress_async} for rel in saved_paths])
         db.session.commit()
+        if compress_async:
+            for tweet_id, rel in zip(tweet_ids, saved_paths):
+                enqueue_compress(DailyTweet, tweet_id, {"image_path": rel})
+        else:
+            enqueue_png_optimize(saved_paths)
         return render_template("success.html", mode="daily", game_id=game_id)
     else:
         flash("沒有成功儲存任何圖片。", "error")
@@ -216,7 +595,62 @@ def daily_upload():
 
 @app.route("/uploads/<path:filename>")
 def uploaded_file(filename):
-    return send_from_directory(app.config["UPLOAD_FOLDER"], filename, as_attachment=False)
+    webp = filename.endswith(".webp")
+    # only clients whose Accept rules WebP out (no image/webp, image/* or */*) get the JPEG/PNG copy;
+    # page navigations like the dashboard's "檢視原圖" links send */* and get the stored file
+    accept = request.accept_mimetypes
+    if webp and accept and accept.quality("image/webp") == 0:
+        filename = webp_fallback(filename)
+    resp = send_upload(filename)
+    if webp:
+        resp.vary.add("Accept")
+    return resp
+
+def send_upload(filename):
+    """Serve a stored file: via the front proxy when UPLOADS_ACCEL_PREFIX is set, else send_from_directory."""
+    if uploads_accel_prefix and not app.debug:
+        if safe_join(app.config["UPLOAD_FOLDER"], filename) is None:
+            abort(404)
+        resp = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        resp.headers["X-Accel-Redirect"] = uploads_accel_prefix.rstrip("/") + "/" + quote(filename)
+        resp.cache_control.max_age = uploads_max_age
+        return resp
+    return send_from_directory(app.config["UPLOAD_FOLDER"], filename, as_attachment=False,
+                               max_age=uploads_max_age, conditional=True)
+
+# transcodes of a stored WebP for clients without WebP support, cached next to it as <name>.webp.jpg/.png
+WEBP_FALLBACK_EXTS = (".jpg", ".png")
+
+def webp_fallback(filename):
+    """Name of the JPEG (PNG if it has alpha) copy of a stored WebP, transcoding it on first request.
+    Returns filename itself if the file doesn't decode (undecodable uploads are kept as-is)."""
+    path = safe_join(app.config["UPLOAD_FOLDER"], filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    for ext in WEBP_FALLBACK_EXTS:
+        if os.path.isfile(path + ext):
+            return filename + ext
+    try:
+        img = Image.open(path)
+        img.load()
+    except Exception:
+        return filename
+    ext = ".png" if img.mode == "RGBA" else ".jpg"
+    # write under a temp name and rename, so concurrent requests never serve a half-written file
+    tmp = f"{path}.{os.urandom(4).hex()}.tmp"
+    if ext == ".png":
+        img.save(tmp, format="PNG", compress_level=6)
+    else:
+        img.convert("RGB").save(tmp, format="JPEG", quality=jpg_quality)
+    os.replace(tmp, path + ext)
+    return filename + ext
+
+def remove_upload(rel):
+    """Delete a stored file and any cached WebP fallback of it."""
+    path = os.path.join(app.config['UPLOAD_FOLDER'], rel)
+    for p in (path, *(path + ext for ext in WEBP_FALLBACK_EXTS)):
+        try: os.remove(p)
+        except OSError: pass
 
 # --- GM (Admin) ---
 @app.route("/gm/login", methods=["GET", "POST"])
@@ -224,11 +658,8 @@ def gm_login():
     if request.method == "POST":
         u = request.form.get("username","").strip()
         p = request.form.get("password","").strip()
-        GM_ACCOUNTS = {
-            os.getenv("ADMIN1_USERNAME", "gm1"): os.getenv("ADMIN1_PASSWORD", "gm1password"),
-            os.getenv("ADMIN2_USERNAME", "gm2"): os.getenv("ADMIN2_PASSWORD", "gm2password")
-        }
-        if u in GM_ACCOUNTS and GM_ACCOUNTS[u] == p:
+        stored = GM_ACCOUNTS.get(u)
+        if stored is not None and check_gm_password(stored, p):
             session["gm_user"] = u
             return redirect(url_for("gm_dashboard"))
         else:
@@ -241,6 +672,12 @@ def gm_logout():
     flash("已登出。", "info")
     return redirect(url_for("gm_login"))
 
+def check_gm_password(stored, given):
+    """ADMINn_PASSWORD may be plaintext or a werkzeug hash (flask gm-hash-password); both compare in constant time."""
+    if stored.startswith(GM_PASSWORD_HASH_PREFIXES):
+        return check_password_hash(stored, given)
+    return hmac.compare_digest(stored.encode(), given.encode())
+
 def require_gm():
     return "gm_user" in session
 
@@ -282,6 +719,8 @@ def gm_mark_dclike(lid):
     return redirect(url_for("gm_dashboard", q=request.args.get("q",""), start=request.args.get("start",""), end=request.args.get("end",""), status=request.args.get("status","")))
 
 # batch mark
+BATCH_MARK_MODELS = {"submission": Submission, "tweet": DailyTweet, "dclike": DcLike}
+
 @app.route("/gm/batch_mark", methods=["POST"])
 def gm_batch_mark():
     if not require_gm():
@@ -290,21 +729,11 @@ def gm_batch_mark():
     table = request.form.get("table")
     changed = 0
     if ids:
-        if table == "submission":
-            for sid in ids:
-                s = Submission.query.get(int(sid))
-                if s and not s.is_granted:
-                    s.is_granted = True; s.granted_by = session.get("gm_user"); s.granted_at = datetime.utcnow(); changed += 1
-        elif table == "tweet":
-            for tid in ids:
-                t = DailyTweet.query.get(int(tid))
-                if t and not t.is_granted:
-                    t.is_granted = True; t.granted_by = session.get("gm_user"); t.granted_at = datetime.utcnow(); changed += 1
-        elif table == "dclike":
-            for lid in ids:
-                r = DcLike.query.get(int(lid))
-                if r and not r.is_granted:
-                    r.is_granted = True; r.granted_by = session.get("gm_user"); r.granted_at = datetime.utcnow(); changed += 1
+        model = BATCH_MARK_MODELS.get(table)
+        if model is not None:
+            stmt = update(model).where(model.id.in_([int(x) for x in ids]), model.is_granted == False)\
+                .values(is_granted=True, granted_by=session.get("gm_user"), granted_at=datetime.utcnow())
+            changed = db.session.execute(stmt).rowcount
         db.session.commit()
         flash(f"已批次標註 {changed} 筆為已發放", "info")
     else:
@@ -319,8 +748,7 @@ def gm_delete_sub(sid):
     r = Submission.query.get_or_404(sid)
     for path in [r.prereg_1, r.prereg_2, r.discord_1, r.discord_2]:
         if path:
-            try: os.remove(os.path.join(app.config['UPLOAD_FOLDER'], path))
-            except: pass
+            remove_upload(path)
     db.session.delete(r)
     db.session.commit()
     flash(f"Submission #{sid} 已刪除", "info")
@@ -332,8 +760,7 @@ def gm_delete_tweet(tid):
         return redirect(url_for("gm_login"))
     r = DailyTweet.query.get_or_404(tid)
     if r.image_path:
-        try: os.remove(os.path.join(app.config['UPLOAD_FOLDER'], r.image_path))
-        except: pass
+        remove_upload(r.image_path)
     db.session.delete(r)
     db.session.commit()
     flash(f"DailyTweet #{tid} 已刪除", "info")
@@ -345,8 +772,7 @@ def gm_delete_dclike(lid):
         return redirect(url_for("gm_login"))
     r = DcLike.query.get_or_404(lid)
     if r.image_path:
-        try: os.remove(os.path.join(app.config['UPLOAD_FOLDER'], r.image_path))
-        except: pass
+        remove_upload(r.image_path)
     db.session.delete(r)
     db.session.commit()
     flash(f"DcLike #{lid} 已刪除", "info")
@@ -361,12 +787,25 @@ def gm_dashboard():
     end = request.args.get("end","").strip()
     status_filter = request.args.get("status","").strip()
     kind = request.args.get("kind","all").strip()    # <-- 新增：顯示哪個類別 
+    # keyset pagination cursor: rows strictly older than (after, after_id) in created_at/id order
+    after = request.args.get("after","").strip()
+    after_id = request.args.get("after_id", type=int)
 
     subs = Submission.query
     tweets = DailyTweet.query
     likes = DcLike.query
 
-    if q:
+    if len(q) >= 2 and q[0] == q[-1] == '"':
+        # "quoted" = exact game_id, served straight from the game_id index
+        exact = q[1:-1]
+        subs = subs.filter(Submission.game_id == exact)
+        tweets = tweets.filter(DailyTweet.game_id == exact)
+        likes = likes.filter(DcLike.game_id == exact)
+    elif q and game_id_fts and len(q) >= 3:
+        subs = subs.filter(Submission.id.in_(game_id_match("submission", q)))
+        tweets = tweets.filter(DailyTweet.id.in_(game_id_match("daily_tweet", q)))
+        likes = likes.filter(DcLike.id.in_(game_id_match("dc_like", q)))
+    elif q:
         subs = subs.filter(Submission.game_id.like(f"%{q}%"))
         tweets = tweets.filter(DailyTweet.game_id.like(f"%{q}%"))
         likes = likes.filter(DcLike.game_id.like(f"%{q}%"))
@@ -394,9 +833,23 @@ def gm_dashboard():
         tweets = tweets.filter(DailyTweet.is_granted == False)
         likes = likes.filter(DcLike.is_granted == False)
 
-    subs = subs.order_by(Submission.created_at.desc()).all()
-    tweets = tweets.order_by(DailyTweet.created_at.desc()).all()
-    likes = likes.order_by(DcLike.created_at.desc()).all()
+    try: after_dt = datetime.fromisoformat(after) if after and after_id is not None else None
+    except ValueError: after_dt = None
+
+    def page(query, model):
+        """One page of `query`, newest first, plus the cursor for the next page (None on the last one)."""
+        if after_dt:
+            query = query.filter(or_(model.created_at < after_dt,
+                                     and_(model.created_at == after_dt, model.id < after_id)))
+        rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(gm_page_size + 1).all()
+        if len(rows) <= gm_page_size:
+            return rows, None
+        rows = rows[:gm_page_size]
+        return rows, {"after": rows[-1].created_at.isoformat(), "after_id": rows[-1].id}
+
+    subs, subs_next = page(subs, Submission)
+    tweets, tweets_next = page(tweets, DailyTweet)
+    likes, likes_next = page(likes, DcLike)
 
     # 依類別篩選（全部 / submission / tweet / dclike）
     show_sub = show_tweet = show_like = True
@@ -407,7 +860,8 @@ def gm_dashboard():
     elif kind == "dclike":
         show_sub = show_tweet = False
 
-    return render_template("admin_dashboard.html", subs=subs, tweets=tweets, likes=likes, q=q, start=start, end=end, status=status_filter,kind=kind, show_sub=show_sub, show_tweet=show_tweet, show_like=show_like)
+    return render_template("admin_dashboard.html", subs=subs, tweets=tweets, likes=likes, q=q, start=start, end=end, status=status_filter,kind=kind, show_sub=show_sub, show_tweet=show_tweet, show_like=show_like,
+                           after=after, subs_next=subs_next, tweets_next=tweets_next, likes_next=likes_next)
 
 @app.route("/gm/submission/<int:sid>")
 def gm_view_submission(sid):
@@ -416,10 +870,44 @@ def gm_view_submission(sid):
     sub = Submission.query.get_or_404(sid)
     return render_template("view_submission.html", sub=sub)
 
+def upgrade_existing_tables():
+    """create_all() skips new columns/indexes on tables that already exist: add them, inspecting each table once."""
+    insp = inspect(db.engine)
+    for model in (Submission, DailyTweet, DcLike):
+        table = model.__tablename__
+        if "compressed" not in {c["name"] for c in insp.get_columns(table)}:
+            with db.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN compressed BOOLEAN NOT NULL DEFAULT TRUE"))
+        existing = {ix["name"] for ix in insp.get_indexes(table)}
+        for ix in model.__table__.indexes:
+            if ix.name not in existing:
+                ix.create(bind=db.engine)
+
 # Initialize storage & DB
 with app.app_context():
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    for folder in UPLOAD_DIRS.values():
+        os.makedirs(folder, exist_ok=True)
+    if db.engine.dialect.name == "sqlite":
+        # before create_all() so every pooled connection, including the first, gets the PRAGMAs
+        event.listen(db.engine, "connect", sqlite_pragmas)
     db.create_all()
+    upgrade_existing_tables()
+    if db.engine.dialect.name == "sqlite":
+        try:
+            create_game_id_fts()
+            game_id_fts = True
+        except OperationalError:
+            # SQLite built without FTS5 / trigram tokenizer (< 3.34): keep LIKE search
+            app.logger.warning("FTS5 trigram search unavailable; /gm search falls back to LIKE.")
+    elif db.engine.dialect.name == "postgresql":
+        try:
+            create_game_id_trgm()
+        except DBAPIError:
+            # CREATE EXTENSION needs a privileged role; have a DBA run it once, LIKE still works meanwhile
+            app.logger.warning("pg_trgm unavailable; /gm search runs unindexed LIKE.")
 
 if __name__ == "__main__":
+    # single-process dev server; production runs `gunicorn -c gunicorn_conf.py app:app`
+    if not os.getenv("FLASK_DEV"):
+        raise SystemExit("Set FLASK_DEV=1 for the dev server, or run: gunicorn -c gunicorn_conf.py app:app")
     app.run(debug=True, host="0.0.0.0", port=5000)
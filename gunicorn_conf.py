@@ -0,0 +1,17 @@
+# gunicorn -c gunicorn_conf.py app:app
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+# image decode/resize/encode is CPU-bound: one process per core, a couple of threads for I/O waits
+workers = int(os.getenv("GUNICORN_WORKERS", max(2, os.cpu_count() or 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+worker_class = "gthread"
+# import app (Pillow, SQLAlchemy, DB init) once in the master; workers share it copy-on-write
+preload_app = True
+timeout = 120
+
+def post_fork(server, worker):
+    # connections opened by the master during init must not be shared across processes
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)